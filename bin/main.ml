@@ -43,12 +43,18 @@ let read_file path =
   close_in ic;
   s
 
+(** Create a directory and any missing parents (mkdir -p) *)
+let rec mkdir_p dir =
+  if not (Sys.file_exists dir) then begin
+    mkdir_p (Filename.dirname dir);
+    try Sys.mkdir dir 0o777
+    with Sys_error _ when Sys.file_exists dir -> ()
+  end
+
 (** Write file contents, creating parent directories if needed *)
 let write_file path content =
-  let dir = Filename.dirname path in
-  if not (Sys.file_exists dir) then
-    ignore (Sys.command (Printf.sprintf "mkdir -p %s" (Filename.quote dir)));
-  let oc = open_out path in
+  mkdir_p (Filename.dirname path);
+  let oc = open_out_bin path in
   output_string oc content;
   close_out oc
 
@@ -78,15 +84,15 @@ let handle_original_file ~keep_original source_path =
 
 (** Build __init__.py content for a single definition by name *)
 let build_single_init name =
-  let buf = Buffer.create 256 in
-  Buffer.add_string buf {|"""Auto-generated by atomyst."""|};
-  Buffer.add_string buf "\n\n";
-  let stem = Snake_case.to_snake_case name in
-  Buffer.add_string buf (Printf.sprintf "from .%s import %s\n" stem name);
-  Buffer.add_string buf "\n__all__ = [\n";
-  Buffer.add_string buf (Printf.sprintf "    \"%s\",\n" name);
-  Buffer.add_string buf "]\n";
-  Buffer.contents buf
+  Printf.sprintf {|"""Auto-generated by atomyst."""
+
+from .%s import %s
+
+__all__ = [
+    "%s",
+]
+|}
+    (Snake_case.to_snake_case name) name name
 
 (** Format timestamp as ISO 8601 *)
 let format_timestamp () =
@@ -96,9 +102,19 @@ let format_timestamp () =
     (tm.Unix.tm_year + 1900) (tm.Unix.tm_mon + 1) tm.Unix.tm_mday
     tm.Unix.tm_hour tm.Unix.tm_min tm.Unix.tm_sec
 
+(** Output filename and relative import line for each definition, in
+    definition order. Computed once per plan and shared by the definition
+    files, _constants.py and __init__.py. *)
+let definition_imports ~prefix_kind definitions =
+  List.map (fun (d : Types.definition) ->
+    let filename = Prefix.generate_filename ~prefix_kind d in
+    let stem = Filename.remove_extension filename in
+    (d.name, (filename, Printf.sprintf "from .%s import %s\n" stem d.name))
+  ) definitions
+
 (** Build __init__.py content for a list of definitions.
     Preserves original module docstring if provided, adds atomization metadata. *)
-let build_init_file ~source_name ~docstring ~prefix_kind definitions =
+let build_init_file ~source_name ~docstring ~defn_imports definitions =
   let buf = Buffer.create 512 in
   let timestamp = format_timestamp () in
   let metadata = format_metadata ~source_name ~timestamp in
@@ -136,14 +152,11 @@ let build_init_file ~source_name ~docstring ~prefix_kind definitions =
      Buffer.add_string buf {|"""|});
   Buffer.add_string buf "\n\n";
   (* Imports *)
-  List.iter (fun (d : Types.definition) ->
-    let stem = Filename.remove_extension (Prefix.generate_filename ~prefix_kind d) in
-    Buffer.add_string buf (Printf.sprintf "from .%s import %s\n" stem d.name)
-  ) definitions;
+  List.iter (fun (_, (_, line)) -> Buffer.add_string buf line) defn_imports;
   (* __all__ *)
   Buffer.add_string buf "\n__all__ = [\n";
   List.iter (fun (d : Types.definition) ->
-    Buffer.add_string buf (Printf.sprintf "    \"%s\",\n" d.name)
+    Printf.bprintf buf "    \"%s\",\n" d.name
   ) definitions;
   Buffer.add_string buf "]\n";
   { Types.relative_path = "__init__.py"; content = Buffer.contents buf }
@@ -161,7 +174,7 @@ let detect_potential_reexports import_lines definitions =
 (** Build _constants.py content from constants and import block.
     Pure function: assembles the file content.
     Detects references to sibling definitions and generates imports for them. *)
-let build_constants_file ~import_block ~constants ~definitions ~prefix_kind =
+let build_constants_file ~import_block ~constants ~definitions ~defn_imports =
   if constants = [] then None
   else
     (* Combine all constant source texts to find sibling references *)
@@ -170,12 +183,9 @@ let build_constants_file ~import_block ~constants ~definitions ~prefix_kind =
     let defn_names = List.map (fun (d : Types.definition) -> d.name) definitions in
     let referenced_defns = Extract.find_constant_references
       ~constant_names:defn_names ~defn_content:all_constants_text in
-    (* Generate sibling imports with kind prefix when enabled *)
+    (* Sibling imports (with kind prefix when enabled) *)
     let sibling_imports = List.filter_map (fun name ->
-      List.find_opt (fun (d : Types.definition) -> d.name = name) definitions
-      |> Option.map (fun d ->
-        let stem = Filename.remove_extension (Prefix.generate_filename ~prefix_kind d) in
-        Printf.sprintf "from .%s import %s\n" stem d.name)
+      List.assoc_opt name defn_imports |> Option.map snd
     ) referenced_defns in
 
     let buf = Buffer.create 512 in
@@ -201,75 +211,56 @@ let build_constants_file ~import_block ~constants ~definitions ~prefix_kind =
 
 (** Detect which constants are referenced by each definition.
     Returns a list of (definition_name, [constant_names]) pairs.
+    [lines] is the source line array already built by the caller.
     Pure function: analysis only, no side effects. *)
-let detect_constant_references source definitions =
-  let constants = Python_parser.extract_constants source in
-  let constant_names = List.map (fun (c : Python_parser.module_constant) -> c.name) constants in
+let detect_constant_references ~constant_names ~lines definitions =
   if constant_names = [] then []
   else
-    let lines =
-      let parts = String.split_on_char '\n' source in
-      let parts =
-        if String.length source > 0 && source.[String.length source - 1] = '\n' then
-          match List.rev parts with
-          | "" :: rest -> List.rev rest
-          | _ -> parts
-        else parts
-      in
-      List.map (fun s -> s ^ "\n") parts
-    in
-    let arr = Array.of_list lines in
+    let matcher = Extract.name_matcher constant_names in
     List.filter_map (fun (defn : Types.definition) ->
-      let defn_lines = Array.sub arr (defn.start_line - 1) (defn.end_line - defn.start_line + 1) in
-      let defn_content = String.concat "" (Array.to_list defn_lines) in
-      let refs = Extract.find_constant_references ~constant_names ~defn_content in
+      let defn_content =
+        Extract.concat_lines lines (defn.start_line - 1) (defn.end_line - defn.start_line + 1) in
+      let refs = Extract.matched_names matcher defn_content in
       if refs = [] then None
       else Some (defn.name, refs)
     ) definitions
 
 (** Plan atomization of a source file. Returns (plan, skipped_docstring, skipped_pragmas, potential_reexports, constant_refs) *)
 let plan_atomization source source_name ~keep_pragmas ~prefix_kind =
-  let lines =
-    let parts = String.split_on_char '\n' source in
-    let parts =
-      if String.length source > 0 && source.[String.length source - 1] = '\n' then
-        match List.rev parts with
-        | "" :: rest -> List.rev rest
-        | _ -> parts
-      else parts
-    in
-    List.map (fun s -> s ^ "\n") parts
+  (* Parse once; definitions and module-level bindings both read this module *)
+  let parsed = Python_parser.parse_module source in
+  let definitions = match parsed with
+    | Ok module_ -> Extract.definitions_of_module module_
+    | Error _ -> []
   in
-  let definitions = Extract.extract_definitions source in
+  (* Split once and pass down: imports, bindings, comment starts and
+     definition bodies all read these lines *)
+  let arr = Python_parser.source_lines source in
+  let lines = Array.to_list arr in
   let import_result = Extract.extract_imports_full ~keep_pragmas lines in
   let potential_reexports = detect_potential_reexports import_result.lines definitions in
   (* Adjust relative imports: when extracting foo.py to foo/, we go 1 level deeper *)
   let adjusted_lines = Extract.adjust_relative_imports ~depth_delta:1 import_result.lines in
   let import_block = String.concat "" adjusted_lines in
 
-  (* Extract module-level constants *)
-  let constants = Python_parser.extract_constants source in
+  (* Extract module-level constants and logger bindings in one pass.
+     Logger bindings depend on __name__ and must be replicated per-file *)
+  let (constants, logger_bindings) = match parsed with
+    | Ok module_ -> Python_parser.extract_bindings_from_module arr module_
+    | Error _ -> ([], [])
+  in
   let constant_names = List.map (fun (c : Python_parser.module_constant) -> c.name) constants in
-
-  (* Extract logger bindings - these depend on __name__ and must be replicated per-file *)
-  let logger_bindings = Python_parser.extract_logger_bindings source in
   let logger_var_names = List.map (fun (lb : Python_parser.logger_binding) -> lb.var_name) logger_bindings in
 
+  let comment_starts = Extract.comment_start_table arr in
+  let defn_imports = definition_imports ~prefix_kind definitions in
+  (* Reference matchers, compiled once and run against every definition *)
+  let defn_matcher = Extract.name_matcher (List.map (fun (d : Types.definition) -> d.name) definitions) in
+  let constant_matcher = Extract.name_matcher constant_names in
+  let logger_matcher = Extract.name_matcher logger_var_names in
   let output_files =
-    List.map (fun (defn : Types.definition) ->
-      let arr = Array.of_list lines in
-      let actual_start =
-        (* find_comment_start logic *)
-        let rec scan idx =
-          if idx < 0 then idx + 2
-          else
-            let stripped = String.trim arr.(idx) in
-            if String.length stripped > 0 && stripped.[0] = '#' then scan (idx - 1)
-            else if stripped = "" then idx + 2
-            else idx + 2
-        in
-        scan (defn.start_line - 2)
-      in
+    List.map2 (fun (defn : Types.definition) (_, (filename, _)) ->
+      let actual_start = comment_starts.(defn.start_line - 1) in
       let defn_lines =
         Array.sub arr (actual_start - 1) (defn.end_line - actual_start + 1)
         |> Array.to_list
@@ -277,23 +268,20 @@ let plan_atomization source source_name ~keep_pragmas ~prefix_kind =
       (* Adjust relative imports inside definition body (depth_delta=1 for extraction to subdir) *)
       let adjusted_defn_lines = Extract.adjust_relative_imports ~depth_delta:1 defn_lines in
       let defn_content = String.concat "" adjusted_defn_lines in
-      (* Find sibling references and generate imports with kind prefix *)
-      let sibling_names = Extract.find_sibling_references ~all_defns:definitions ~target_defn:defn ~defn_content in
+      (* Find sibling references and reuse their import lines *)
+      let sibling_names =
+        List.filter (fun name -> name <> defn.name) (Extract.matched_names defn_matcher defn_content) in
       let sibling_import_lines = List.filter_map (fun name ->
-        List.find_opt (fun (d : Types.definition) -> d.name = name) definitions
-        |> Option.map (fun d ->
-          let stem = Filename.remove_extension (Prefix.generate_filename ~prefix_kind d) in
-          Printf.sprintf "from .%s import %s\n" stem d.name)
+        List.assoc_opt name defn_imports |> Option.map snd
       ) sibling_names in
-      let sibling_imports = String.concat "" sibling_import_lines in
       (* Find constant references and generate imports *)
-      let const_refs = Extract.find_constant_references ~constant_names ~defn_content in
+      let const_refs = Extract.matched_names constant_matcher defn_content in
       let const_import =
         if const_refs = [] then ""
         else Printf.sprintf "from ._constants import %s\n" (String.concat ", " const_refs)
       in
       (* Find logger references and generate per-file logger bindings *)
-      let logger_refs = Extract.find_constant_references ~constant_names:logger_var_names ~defn_content in
+      let logger_refs = Extract.matched_names logger_matcher defn_content in
       let logger_lines =
         if logger_refs = [] then ""
         else
@@ -303,34 +291,33 @@ let plan_atomization source source_name ~keep_pragmas ~prefix_kind =
           ) logger_refs in
           String.concat "" binding_texts
       in
-      let trimmed =
-        let s = defn_content in
-        let len = String.length s in
-        let rec find_start i =
-          if i >= len then len
-          else if s.[i] = '\n' then find_start (i + 1)
-          else i
+      (* Combine in one buffer: original imports + sibling imports + constant imports
+         + logger bindings + definition (leading newlines trimmed) *)
+      let content =
+        let len = String.length defn_content in
+        let rec body_start i =
+          if i < len && defn_content.[i] = '\n' then body_start (i + 1) else i
         in
-        String.sub s (find_start 0) (len - find_start 0)
+        let start = body_start 0 in
+        let buf = Buffer.create (String.length import_block + len + 256) in
+        Buffer.add_string buf import_block;
+        List.iter (Buffer.add_string buf) sibling_import_lines;
+        Buffer.add_string buf const_import;
+        (* Add logger bindings after imports (they need import logging to be present) *)
+        if logger_lines <> "" then begin
+          Buffer.add_char buf '\n';
+          Buffer.add_string buf logger_lines
+        end;
+        Buffer.add_string buf "\n\n";
+        Buffer.add_substring buf defn_content start (len - start);
+        Buffer.contents buf
       in
-      (* Combine: original imports + sibling imports + constant imports + logger bindings + definition *)
-      let imports_section =
-        let base = if sibling_imports = "" then import_block else import_block ^ sibling_imports in
-        if const_import = "" then base else base ^ const_import
-      in
-      (* Add logger bindings after imports (they need import logging to be present) *)
-      let pre_definition =
-        if logger_lines = "" then imports_section
-        else imports_section ^ "\n" ^ logger_lines
-      in
-      let content = pre_definition ^ "\n\n" ^ trimmed in
-      let filename = Prefix.generate_filename ~prefix_kind defn in
       { Types.relative_path = filename; content }
-    ) definitions
+    ) definitions defn_imports
   in
-  let init_file = build_init_file ~source_name ~docstring:import_result.docstring ~prefix_kind definitions in
-  let constants_file = build_constants_file ~import_block ~constants ~definitions ~prefix_kind in
-  let constant_refs = detect_constant_references source definitions in
+  let init_file = build_init_file ~source_name ~docstring:import_result.docstring ~defn_imports definitions in
+  let constants_file = build_constants_file ~import_block ~constants ~definitions ~defn_imports in
+  let constant_refs = detect_constant_references ~constant_names ~lines:arr definitions in
   let all_output_files =
     let base = output_files @ [init_file] in
     match constants_file with
@@ -475,18 +462,6 @@ let run_atomize source_path output_dir dry_run format_opt keep_pragmas manifest_
     end
   end
 
-(** Helper to split source into lines *)
-let source_to_lines source =
-  let parts = String.split_on_char '\n' source in
-  let parts =
-    if String.length source > 0 && source.[String.length source - 1] = '\n' then
-      match List.rev parts with
-      | "" :: rest -> List.rev rest
-      | _ -> parts
-    else parts
-  in
-  List.map (fun s -> s ^ "\n") parts
-
 (** Run single extraction *)
 let run_extract source_path name output_dir dry_run format_opt keep_pragmas =
   if not (Sys.file_exists source_path) then begin
@@ -495,15 +470,14 @@ let run_extract source_path name output_dir dry_run format_opt keep_pragmas =
   end else begin
     let source = read_file source_path in
 
-    (* Get import metadata for warnings *)
-    let lines = source_to_lines source in
-    let import_result = Extract.extract_imports_full ~keep_pragmas lines in
-
     match Extract.extract_one source name with
     | None ->
       print_endline (Render.error (Printf.sprintf "Definition '%s' not found in %s" name source_path));
       1
     | Some result ->
+      (* Get import metadata for warnings *)
+      let lines = Array.to_list (Python_parser.source_lines source) in
+      let import_result = Extract.extract_imports_full ~keep_pragmas lines in
       let resolved_output_dir = match output_dir with
         | Some dir -> dir
         | None -> Sys.getcwd ()
@@ -2,14 +2,18 @@
 
 open Types
 
+let definition_of_extracted (d : Python_parser.extracted_definition) =
+  { name = d.name;
+    kind = d.kind;
+    start_line = d.loc.start_line + 1;  (* 0-indexed to 1-indexed *)
+    end_line = d.loc.end_line + 1;
+  }
+
 let extract_definitions source =
-  Python_parser.extract_definitions source
-  |> List.map (fun (d : Python_parser.extracted_definition) ->
-    { name = d.name;
-      kind = d.kind;
-      start_line = d.loc.start_line + 1;  (* 0-indexed to 1-indexed *)
-      end_line = d.loc.end_line + 1;
-    })
+  List.map definition_of_extracted (Python_parser.extract_definitions source)
+
+let definitions_of_module module_ =
+  List.map definition_of_extracted (Python_parser.extract_definitions_from_module module_)
 
 (** Regex for matching relative imports: from .xxx or from . import
     Captures: (1) prefix "from ", (2) dots, (3) rest of line including newline
@@ -79,19 +83,24 @@ let make_initial_state ~keep_pragmas = {
 }
 
 (** Helper: check if string starts with prefix *)
-let starts_with s prefix =
-  String.length s >= String.length prefix &&
-  String.sub s 0 (String.length prefix) = prefix
+let starts_with s prefix = String.starts_with ~prefix s
 
 (** Helper: check if string ends with suffix *)
-let ends_with s suffix =
-  String.length s >= String.length suffix &&
-  String.sub s (String.length s - String.length suffix) (String.length suffix) = suffix
+let ends_with s suffix = String.ends_with ~suffix s
 
 (** Helper: count occurrences of char in string *)
 let count_char s c =
   String.fold_left (fun acc ch -> if ch = c then acc + 1 else acc) 0 s
 
+(** Helper: net parenthesis depth change of a line, in a single pass *)
+let paren_delta s =
+  String.fold_left (fun acc ch ->
+    match ch with
+    | '(' -> acc + 1
+    | ')' -> acc - 1
+    | _ -> acc
+  ) 0 s
+
 (** Helper: get indentation (number of leading spaces/tabs) *)
 let get_indent line =
   let len = String.length line in
@@ -103,18 +112,12 @@ let get_indent line =
   in
   count 0
 
+(** Regex: pragma directive comment, with or without a space after '#'.
+    One compiled match replaces testing each directive prefix in turn. *)
+let re_pragma = Re.Pcre.regexp {|^# ?(mypy:|type:|noqa|pylint:|ruff:)|}
+
 (** Helper: check if a comment line is a pragma directive *)
-let is_pragma stripped =
-  starts_with stripped "# mypy:" ||
-  starts_with stripped "# type:" ||
-  starts_with stripped "# noqa" ||
-  starts_with stripped "# pylint:" ||
-  starts_with stripped "# ruff:" ||
-  starts_with stripped "#mypy:" ||
-  starts_with stripped "#type:" ||
-  starts_with stripped "#noqa" ||
-  starts_with stripped "#pylint:" ||
-  starts_with stripped "#ruff:"
+let is_pragma stripped = Re.execp re_pragma stripped
 
 (** Process one line, returning new state *)
 let process_line state line =
@@ -196,12 +199,12 @@ let process_line state line =
 
     (* Import statement *)
     else if starts_with stripped "import " || starts_with stripped "from " then
-      let new_depth = state.paren_depth + count_char line '(' - count_char line ')' in
+      let new_depth = state.paren_depth + paren_delta line in
       add_line { state with in_imports = true; paren_depth = new_depth }
 
     (* Continuation of multi-line import *)
     else if state.paren_depth > 0 then
-      let new_depth = state.paren_depth + count_char line '(' - count_char line ')' in
+      let new_depth = state.paren_depth + paren_delta line in
       add_line { state with paren_depth = new_depth }
 
     (* Empty line after imports started - include it *)
@@ -222,7 +225,14 @@ let process_line state line =
     Pure: string list -> keep_pragmas:bool -> import_result *)
 let extract_imports_full ?(keep_pragmas=false) (lines : string list) : import_result =
   let initial = make_initial_state ~keep_pragmas in
-  let final_state = List.fold_left process_line initial lines in
+  (* Stop at the end of the import block rather than folding over the
+     rest of the file (the body is usually most of it) *)
+  let rec go state lines =
+    match lines with
+    | line :: rest when not state.done_extracting -> go (process_line state line) rest
+    | _ -> state
+  in
+  let final_state = go initial lines in
   let docstring =
     if final_state.docstring_lines = [] then None
     else Some (String.concat "" (List.rev final_state.docstring_lines))
@@ -274,27 +284,39 @@ let parse_import_names (import_lines : string list) : parsed_import list =
   let stmts = Python_parser.extract_imports source in
   List.concat_map parsed_imports_of_stmt stmts
 
+(** Whole-word matcher for a fixed list of names: one alternation, so
+    content is scanned once however many names there are *)
+type name_matcher = {
+  candidates : string list;
+  pattern : Re.re;
+}
+
+let name_matcher candidates =
+  let alternation = String.concat "|" (List.map Re.Pcre.quote candidates) in
+  { candidates; pattern = Re.Pcre.regexp (Printf.sprintf {|\b(%s)\b|} alternation) }
+
+(** Names are identifiers, so each match spans exactly one whole name *)
+let matched_names matcher content =
+  if matcher.candidates = [] then []
+  else begin
+    let found = Hashtbl.create 16 in
+    List.iter (fun g -> Hashtbl.replace found (Re.Group.get g 0) ())
+      (Re.all matcher.pattern content);
+    List.filter (Hashtbl.mem found) matcher.candidates
+  end
+
 (** Find sibling definitions referenced in a definition's content.
     Uses word boundary matching to find references to other definitions.
     Returns list of definition names that are referenced. *)
 let find_sibling_references ~(all_defns : definition list) ~(target_defn : definition) ~defn_content =
-  (* Build list of other definition names (excluding self) *)
-  let sibling_names = List.filter_map (fun (d : definition) ->
-    if d.name = target_defn.name then None else Some d.name
-  ) all_defns in
-  (* Check which siblings appear as word in the content *)
-  List.filter (fun name ->
-    let pattern = Re.Pcre.regexp (Printf.sprintf {|\b%s\b|} (Re.Pcre.quote name)) in
-    Re.execp pattern defn_content
-  ) sibling_names
+  let all_names = List.map (fun (d : definition) -> d.name) all_defns in
+  List.filter (fun name -> name <> target_defn.name)
+    (matched_names (name_matcher all_names) defn_content)
 
 (** Find which constant names are referenced in content.
     Pure function: list filtering via word-boundary regex. *)
 let find_constant_references ~constant_names ~defn_content =
-  List.filter (fun name ->
-    let pattern = Re.Pcre.regexp (Printf.sprintf {|\b%s\b|} (Re.Pcre.quote name)) in
-    Re.execp pattern defn_content
-  ) constant_names
+  matched_names (name_matcher constant_names) defn_content
 
 (** Generate import lines for sibling references.
     Returns lines like "from .sibling_module import SiblingClass\n" *)
@@ -307,49 +329,70 @@ let generate_sibling_imports sibling_names =
 (** Find where comments immediately preceding a definition begin.
     Looks backwards from start_line to find contiguous comment lines.
     Returns the adjusted start line (1-indexed). *)
-let find_comment_start lines start_line =
-  let arr = Array.of_list lines in
+let find_comment_start (lines : string array) start_line =
   let rec scan idx =
     if idx < 0 then idx + 2
     else
-      let stripped = String.trim arr.(idx) in
+      let stripped = String.trim lines.(idx) in
       if starts_with stripped "#" then scan (idx - 1)
       else if stripped = "" then idx + 2
       else idx + 2
   in
   scan (start_line - 2)
 
+(** Comment-block start for every line, in one forward pass.
+    [table.(i)] equals [find_comment_start lines (i + 1)]: a line inherits
+    the block start of the line above when that line is a comment. *)
+let comment_start_table (lines : string array) =
+  let n = Array.length lines in
+  let table = Array.make n 1 in
+  for i = 1 to n - 1 do
+    let stripped = String.trim lines.(i - 1) in
+    table.(i) <- if starts_with stripped "#" then table.(i - 1) else i + 1
+  done;
+  table
+
+(** Concatenate [count] lines of [lines] starting at index [first].
+    Sizes the result once from the line lengths and blits straight into it,
+    without an intermediate sub-array or list. *)
+let concat_lines (lines : string array) first count =
+  let len = ref 0 in
+  for i = first to first + count - 1 do
+    len := !len + String.length lines.(i)
+  done;
+  let buf = Bytes.create !len in
+  let pos = ref 0 in
+  for i = first to first + count - 1 do
+    let line = lines.(i) in
+    Bytes.blit_string line 0 buf !pos (String.length line);
+    pos := !pos + String.length line
+  done;
+  Bytes.unsafe_to_string buf
+
 (** Build an output file for a single definition.
-    Includes import block, sibling imports, and any preceding comments. *)
-let build_definition_file ~(all_defns : definition list) (defn : definition) lines import_block =
-  let actual_start = find_comment_start lines defn.start_line in
-  let arr = Array.of_list lines in
-  let defn_lines =
-    Array.sub arr (actual_start - 1) (defn.end_line - actual_start + 1)
-    |> Array.to_list
-  in
-  let defn_content = String.concat "" defn_lines in
+    Includes import block, sibling imports, and any preceding comments.
+    [lines] is the source split into lines; [actual_start] is the
+    definition's first line including leading comments. *)
+let build_definition_file ~(all_defns : definition list) ~actual_start (defn : definition) (lines : string array) import_block =
+  let defn_content = concat_lines lines (actual_start - 1) (defn.end_line - actual_start + 1) in
   (* Find and generate sibling imports *)
   let sibling_names = find_sibling_references ~all_defns ~target_defn:defn ~defn_content in
   let sibling_import_lines = generate_sibling_imports sibling_names in
-  let sibling_imports = String.concat "" sibling_import_lines in
-  (* Trim leading newlines from definition, then add proper spacing *)
-  let trimmed_content =
-    let s = defn_content in
-    let len = String.length s in
-    let rec find_start i =
-      if i >= len then len
-      else if s.[i] = '\n' then find_start (i + 1)
-      else i
+  (* Combine in one buffer: original imports + sibling imports + definition,
+     with leading newlines trimmed from the definition *)
+  let file_content =
+    let len = String.length defn_content in
+    let rec body_start i =
+      if i < len && defn_content.[i] = '\n' then body_start (i + 1) else i
     in
-    String.sub s (find_start 0) (len - find_start 0)
-  in
-  (* Combine: original imports + sibling imports + definition *)
-  let imports_section =
-    if sibling_imports = "" then import_block
-    else import_block ^ sibling_imports
+    let start = body_start 0 in
+    let buf = Buffer.create (String.length import_block + len + 128) in
+    Buffer.add_string buf import_block;
+    List.iter (Buffer.add_string buf) sibling_import_lines;
+    Buffer.add_string buf "\n\n";
+    Buffer.add_substring buf defn_content start (len - start);
+    Buffer.contents buf
   in
-  let file_content = imports_section ^ "\n\n" ^ trimmed_content in
   let filename = Snake_case.to_snake_case defn.name ^ ".py" in
   { relative_path = filename; content = file_content }
 
@@ -357,41 +400,27 @@ let build_definition_file ~(all_defns : definition list) (defn : definition) lin
     Returns None if the definition is not found.
     Pure: (string, string, ?depth_delta:int) -> extraction_result option *)
 let extract_one ?(depth_delta=0) source name =
-  (* Split source into lines, preserving original newline structure *)
-  let lines =
-    let parts = String.split_on_char '\n' source in
-    (* split_on_char "a\nb\n" gives ["a"; "b"; ""] - drop the trailing empty *)
-    let parts =
-      if String.length source > 0 && source.[String.length source - 1] = '\n' then
-        match List.rev parts with
-        | "" :: rest -> List.rev rest
-        | _ -> parts
-      else parts
-    in
-    List.map (fun s -> s ^ "\n") parts
-  in
   let definitions : definition list = extract_definitions source in
-  let import_lines = extract_imports lines in
-  let adjusted_lines = adjust_relative_imports ~depth_delta import_lines in
-  let import_block = String.concat "" adjusted_lines in
-
-  (* Find the target definition *)
+  (* Find the target definition first: nothing else is needed when absent *)
   match List.find_opt (fun (d : definition) -> d.name = name) definitions with
   | None -> None
   | Some target ->
+    (* Split once; the import scan and the definition file share it *)
+    let arr = Python_parser.source_lines source in
+    let lines = Array.to_list arr in
+    let import_lines = extract_imports lines in
+    let adjusted_lines = adjust_relative_imports ~depth_delta import_lines in
+    let import_block = String.concat "" adjusted_lines in
+
+    (* Leading comments travel with the definition *)
+    let actual_start = find_comment_start arr target.start_line in
+
     (* Build the extracted file *)
-    let extracted = build_definition_file ~all_defns:definitions target lines import_block in
+    let extracted = build_definition_file ~all_defns:definitions ~actual_start target arr import_block in
 
     (* Build the remainder (source with definition removed) *)
-    let actual_start = find_comment_start lines target.start_line in
-    let arr = Array.of_list lines in
-    let before = Array.sub arr 0 (actual_start - 1) |> Array.to_list in
-    let after =
-      if target.end_line < Array.length arr then
-        Array.sub arr target.end_line (Array.length arr - target.end_line)
-        |> Array.to_list
-      else []
-    in
-    let remainder = String.concat "" (before @ after) in
+    let before = concat_lines arr 0 (actual_start - 1) in
+    let after = concat_lines arr target.end_line (Array.length arr - target.end_line) in
+    let remainder = before ^ after in
 
     Some { extracted; remainder }
@@ -23,6 +23,10 @@ val extract_definitions : string -> definition list
 
     @raise Failure if tree-sitter parsing fails *)
 
+val definitions_of_module : PyreAst.Concrete.Module.t -> definition list
+(** [definitions_of_module module_] is [extract_definitions] on a module
+    already parsed with [Python_parser.parse_module]. *)
+
 (** Result of import extraction with metadata about skipped content *)
 type import_result = {
   lines : string list;
@@ -70,6 +74,17 @@ val parse_import_names : string list -> parsed_import list
 
 val adjust_relative_imports : depth_delta:int -> string list -> string list
 
+type name_matcher
+(** Whole-word matcher for a fixed list of names *)
+
+val name_matcher : string list -> name_matcher
+(** [name_matcher names] compiles one matcher for [names]. Build it once
+    and reuse it for every content checked against the same names. *)
+
+val matched_names : name_matcher -> string -> string list
+(** [matched_names matcher content] returns the matcher's names that appear
+    as a whole word in [content], in the order given to [name_matcher]. *)
+
 val find_sibling_references : all_defns:Types.definition list -> target_defn:Types.definition -> defn_content:string -> string list
 (** [find_sibling_references ~all_defns ~target_defn ~defn_content] finds
     names of sibling definitions that are referenced in [defn_content].
@@ -98,6 +113,19 @@ val generate_sibling_imports : string list -> string list
     - ["import foo"] is unchanged (not a relative import)
 *)
 
+val concat_lines : string array -> int -> int -> string
+(** [concat_lines lines first count] joins [count] lines starting at
+    0-indexed [first] into one exactly-sized string. *)
+
+val comment_start_table : string array -> int array
+(** [comment_start_table lines] computes, in one forward pass, where the
+    comment block immediately preceding each line begins.
+
+    For a definition starting at 1-indexed [start_line], the start
+    including its leading comments is [table.(start_line - 1)].
+    Lets batch atomization look up every definition in O(1) instead of
+    scanning backwards from each one. *)
+
 val extract_one : ?depth_delta:int -> string -> string -> extraction_result option
 (** [extract_one ?depth_delta source name] extracts a single definition by name from source.
 
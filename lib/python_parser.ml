@@ -29,6 +29,33 @@ type import_stmt =
       loc : location;
     }
 
+(** Tagless-final spec building the concrete AST.
+    It is a record of constructors, so one instance serves every parse. *)
+let spec = PyreAst.Concrete.make_tagless_final ()
+
+(** Parse a module, rendering parser errors as messages *)
+let parse_module source : (PyreAst.Concrete.Module.t, string) result =
+  PyreAst.Parser.with_context
+    ~on_init_failure:(fun () -> Error "Failed to initialize Python parser")
+    (fun ctx ->
+      match PyreAst.Parser.TaglessFinal.parse_module ~context:ctx ~spec source with
+      | Ok module_ -> Ok module_
+      | Error err ->
+        Error (Printf.sprintf "Parse error at line %d col %d: %s"
+          err.line err.column err.message))
+
+(** Split source into lines, preserving newlines *)
+let source_lines source =
+  let parts = String.split_on_char '\n' source in
+  let parts =
+    if String.length source > 0 && source.[String.length source - 1] = '\n' then
+      match List.rev parts with
+      | "" :: rest -> List.rev rest
+      | _ -> parts
+    else parts
+  in
+  Array.of_list (List.map (fun s -> s ^ "\n") parts)
+
 (** Convert pyre-ast location to our 0-indexed location.
     pyre-ast uses 1-indexed lines, 0-indexed columns. *)
 let location_of_pyre (pyre_loc : PyreAst.Concrete.Location.t) : location =
@@ -73,25 +100,14 @@ let extract_from_module (mod_ : PyreAst.Concrete.Module.t) : import_stmt list =
   ) body
 
 let extract_imports source : import_stmt list =
-  PyreAst.Parser.with_context
-    ~on_init_failure:(fun () -> [])
-    (fun ctx ->
-      let spec = PyreAst.Concrete.make_tagless_final () in
-      match PyreAst.Parser.TaglessFinal.parse_module ~context:ctx ~spec source with
-      | Ok module_ -> extract_from_module module_
-      | Error _ -> [])
+  match parse_module source with
+  | Ok module_ -> extract_from_module module_
+  | Error _ -> []
 
 let extract_imports_with_error source : import_stmt list * string option =
-  PyreAst.Parser.with_context
-    ~on_init_failure:(fun () -> ([], Some "Failed to initialize Python parser"))
-    (fun ctx ->
-      let spec = PyreAst.Concrete.make_tagless_final () in
-      match PyreAst.Parser.TaglessFinal.parse_module ~context:ctx ~spec source with
-      | Ok module_ -> (extract_from_module module_, None)
-      | Error err ->
-        let msg = Printf.sprintf "Parse error at line %d col %d: %s"
-          err.line err.column err.message in
-        ([], Some msg))
+  match parse_module source with
+  | Ok module_ -> (extract_from_module module_, None)
+  | Error msg -> ([], Some msg)
 
 (** Module-level constant: Assign, AnnAssign with simple Name target *)
 type module_constant = {
@@ -111,31 +127,23 @@ type logger_binding = {
 (** Check if name is a dunder (double-underscore) name *)
 let is_dunder name =
   String.length name >= 4 &&
-  String.sub name 0 2 = "__" &&
-  String.sub name (String.length name - 2) 2 = "__"
+  String.starts_with ~prefix:"__" name &&
+  String.ends_with ~suffix:"__" name
 
 (** Check if an expression is a call to logging.getLogger(__name__).
     This pattern depends on __name__ and must not be extracted to _constants.py. *)
 let is_logger_getname_call (expr : PyreAst.Concrete.Expression.t) : bool =
   let open PyreAst.Concrete in
   match expr with
-  | Expression.Call { func; args; _ } ->
-    (* Check if func is logging.getLogger or <alias>.getLogger *)
-    let is_getlogger_func =
-      match func with
-      | Expression.Attribute { value = Expression.Name _; attr; _ } ->
-        Identifier.to_string attr = "getLogger"
+  (* Shape check on func first (logging.getLogger or <alias>.getLogger);
+     the arguments are only scanned for __name__ once it matches *)
+  | Expression.Call { func = Expression.Attribute { value = Expression.Name _; attr; _ }; args; _ }
+    when Identifier.to_string attr = "getLogger" ->
+    List.exists (fun arg ->
+      match arg with
+      | Expression.Name { id; _ } -> Identifier.to_string id = "__name__"
       | _ -> false
-    in
-    (* Check if any argument is __name__ *)
-    let has_dunder_name_arg =
-      List.exists (fun arg ->
-        match arg with
-        | Expression.Name { id; _ } -> Identifier.to_string id = "__name__"
-        | _ -> false
-      ) args
-    in
-    is_getlogger_func && has_dunder_name_arg
+    ) args
   | _ -> false
 
 (** Extract source text from location.
@@ -145,112 +153,58 @@ let extract_source_text source_lines loc =
   let lines = Array.sub source_lines start_line (end_line - start_line + 1) in
   String.concat "" (Array.to_list lines)
 
-(** Extract constant definitions from parsed module.
-    Filters for: Assign with Name target, AnnAssign with Name target.
-    Excludes: dunder names, augmented assignments, logger patterns. *)
-let extract_constants_from_module source_lines (mod_ : PyreAst.Concrete.Module.t) : module_constant list =
+(** Classify module-level bindings in one pass over the body.
+    Constants: Assign or AnnAssign with a single Name target, and TypeAlias.
+    Excludes: dunder names, augmented assignments.
+    Logger bindings (logger = logging.getLogger(__name__)) go to the second
+    list instead: they depend on __name__ and must be replicated per-file. *)
+let extract_bindings_from_module source_lines (mod_ : PyreAst.Concrete.Module.t)
+    : module_constant list * logger_binding list =
   let open PyreAst.Concrete in
   let { Module.body; _ } = mod_ in
-  List.filter_map (fun stmt ->
-    match stmt with
-    (* Simple assignment: NAME = value *)
-    | Statement.Assign { location; targets; value; _ } ->
-      (* Only handle single Name target *)
-      (match targets with
-       | [Expression.Name { id; _ }] ->
-         let name = Identifier.to_string id in
-         (* Exclude dunder names and logger patterns *)
-         if is_dunder name || is_logger_getname_call value then None
-         else
-           let loc = location_of_pyre location in
-           let source_text = extract_source_text source_lines loc in
-           Some { name; loc; source_text }
-       | _ -> None)
-    (* Annotated assignment: NAME: type = value or NAME: type *)
-    | Statement.AnnAssign { location; target; value; _ } ->
-      (match target with
-       | Expression.Name { id; _ } ->
-         let name = Identifier.to_string id in
-         (* Exclude dunder names and logger patterns (if value present) *)
-         let is_logger = match value with
-           | Some v -> is_logger_getname_call v
-           | None -> false
-         in
-         if is_dunder name || is_logger then None
-         else
-           let loc = location_of_pyre location in
-           let source_text = extract_source_text source_lines loc in
-           Some { name; loc; source_text }
-       | _ -> None)
-    (* Type alias: type NAME = ... (Python 3.12+) *)
-    | Statement.TypeAlias { location; name = Expression.Name { id; _ }; _ } ->
-      let name = Identifier.to_string id in
-      let loc = location_of_pyre location in
-      let source_text = extract_source_text source_lines loc in
-      Some { name; loc; source_text }
-    | _ -> None
-  ) body
-
-(** Split source into lines, preserving newlines *)
-let source_to_lines source =
-  let parts = String.split_on_char '\n' source in
-  let parts =
-    if String.length source > 0 && source.[String.length source - 1] = '\n' then
-      match List.rev parts with
-      | "" :: rest -> List.rev rest
-      | _ -> parts
-    else parts
+  let constant name location : module_constant =
+    let loc = location_of_pyre location in
+    { name; loc; source_text = extract_source_text source_lines loc }
   in
-  Array.of_list (List.map (fun s -> s ^ "\n") parts)
+  let logger var_name location : logger_binding =
+    let loc = location_of_pyre location in
+    { var_name; loc; source_text = extract_source_text source_lines loc }
+  in
+  let (constants, loggers) =
+    List.fold_left (fun (constants, loggers) stmt ->
+      match stmt with
+      (* Simple assignment: NAME = value (single Name target only) *)
+      | Statement.Assign { location; targets = [Expression.Name { id; _ }]; value; _ } ->
+        let name = Identifier.to_string id in
+        if is_logger_getname_call value then (constants, logger name location :: loggers)
+        else if is_dunder name then (constants, loggers)
+        else (constant name location :: constants, loggers)
+      (* Annotated assignment: NAME: type = value or NAME: type *)
+      | Statement.AnnAssign { location; target = Expression.Name { id; _ }; value; _ } ->
+        let name = Identifier.to_string id in
+        let is_logger = match value with
+          | Some v -> is_logger_getname_call v
+          | None -> false
+        in
+        if is_logger then (constants, logger name location :: loggers)
+        else if is_dunder name then (constants, loggers)
+        else (constant name location :: constants, loggers)
+      (* Type alias: type NAME = ... (Python 3.12+) *)
+      | Statement.TypeAlias { location; name = Expression.Name { id; _ }; _ } ->
+        (constant (Identifier.to_string id) location :: constants, loggers)
+      | _ -> (constants, loggers)
+    ) ([], []) body
+  in
+  (List.rev constants, List.rev loggers)
 
-let extract_constants source : module_constant list =
-  PyreAst.Parser.with_context
-    ~on_init_failure:(fun () -> [])
-    (fun ctx ->
-      let spec = PyreAst.Concrete.make_tagless_final () in
-      match PyreAst.Parser.TaglessFinal.parse_module ~context:ctx ~spec source with
-      | Ok module_ ->
-        let source_lines = source_to_lines source in
-        extract_constants_from_module source_lines module_
-      | Error _ -> [])
+let extract_bindings source : module_constant list * logger_binding list =
+  match parse_module source with
+  | Ok module_ -> extract_bindings_from_module (source_lines source) module_
+  | Error _ -> ([], [])
 
-(** Extract logger bindings from parsed module.
-    These are assignments like: logger = logging.getLogger(__name__)
-    They depend on __name__ and must be replicated per-file. *)
-let extract_logger_bindings_from_module source_lines (mod_ : PyreAst.Concrete.Module.t) : logger_binding list =
-  let open PyreAst.Concrete in
-  let { Module.body; _ } = mod_ in
-  List.filter_map (fun stmt ->
-    match stmt with
-    | Statement.Assign { location; targets; value; _ } ->
-      (match targets with
-       | [Expression.Name { id; _ }] when is_logger_getname_call value ->
-         let var_name = Identifier.to_string id in
-         let loc = location_of_pyre location in
-         let source_text = extract_source_text source_lines loc in
-         Some { var_name; loc; source_text }
-       | _ -> None)
-    | Statement.AnnAssign { location; target; value = Some v; _ } when is_logger_getname_call v ->
-      (match target with
-       | Expression.Name { id; _ } ->
-         let var_name = Identifier.to_string id in
-         let loc = location_of_pyre location in
-         let source_text = extract_source_text source_lines loc in
-         Some { var_name; loc; source_text }
-       | _ -> None)
-    | _ -> None
-  ) body
+let extract_constants source : module_constant list = fst (extract_bindings source)
 
-let extract_logger_bindings source : logger_binding list =
-  PyreAst.Parser.with_context
-    ~on_init_failure:(fun () -> [])
-    (fun ctx ->
-      let spec = PyreAst.Concrete.make_tagless_final () in
-      match PyreAst.Parser.TaglessFinal.parse_module ~context:ctx ~spec source with
-      | Ok module_ ->
-        let source_lines = source_to_lines source in
-        extract_logger_bindings_from_module source_lines module_
-      | Error _ -> [])
+let extract_logger_bindings source : logger_binding list = snd (extract_bindings source)
 
 (** A top-level definition extracted from source *)
 type extracted_definition = {
@@ -287,37 +241,32 @@ let decorated_location (base_loc : PyreAst.Concrete.Location.t) decorator_list =
     (* Use decorator's line but keep base column (decorator expr starts after @) *)
     { base with start_line = dec_loc.start_line }
 
-(** Extract top-level definitions from parsed module *)
+(** Build a definition of the given kind if it starts at column 0 *)
+let top_level_definition ~kind name location decorator_list : extracted_definition option =
+  let loc = decorated_location location decorator_list in
+  if loc.start_col = 0 then
+    Some { name = PyreAst.Concrete.Identifier.to_string name; kind; loc }
+  else None
+
+(** Extract top-level definitions from parsed module.
+    The match only selects the kind; construction is shared. *)
 let extract_definitions_from_module (mod_ : PyreAst.Concrete.Module.t) : extracted_definition list =
   let open PyreAst.Concrete in
   let { Module.body; _ } = mod_ in
   List.filter_map (fun stmt ->
     match stmt with
     | Statement.FunctionDef { location; name; decorator_list; _ } ->
-      let loc = decorated_location location decorator_list in
-      if loc.start_col = 0 then
-        Some { name = Identifier.to_string name; kind = Types.Function; loc }
-      else None
+      top_level_definition ~kind:Types.Function name location decorator_list
     | Statement.AsyncFunctionDef { location; name; decorator_list; _ } ->
-      let loc = decorated_location location decorator_list in
-      if loc.start_col = 0 then
-        Some { name = Identifier.to_string name; kind = Types.AsyncFunction; loc }
-      else None
+      top_level_definition ~kind:Types.AsyncFunction name location decorator_list
     | Statement.ClassDef { location; name; decorator_list; _ } ->
-      let loc = decorated_location location decorator_list in
-      if loc.start_col = 0 then
-        Some { name = Identifier.to_string name; kind = Types.Class; loc }
-      else None
+      top_level_definition ~kind:Types.Class name location decorator_list
     | _ -> None
   ) body
 
 let extract_definitions source : extracted_definition list =
-  PyreAst.Parser.with_context
-    ~on_init_failure:(fun () -> [])
-    (fun ctx ->
-      let spec = PyreAst.Concrete.make_tagless_final () in
-      match PyreAst.Parser.TaglessFinal.parse_module ~context:ctx ~spec source with
-      | Ok module_ ->
-        extract_definitions_from_module module_
-        |> List.sort (fun a b -> compare a.loc.start_line b.loc.start_line)
-      | Error _ -> [])
+  match parse_module source with
+  | Ok module_ ->
+    (* Module body is in source order, so the result is already sorted *)
+    extract_definitions_from_module module_
+  | Error _ -> []
@@ -32,6 +32,15 @@ type import_stmt =
       loc : location;
     }
 
+(** Split source into lines, each keeping its trailing newline (one is
+    added to a final line that lacks it). *)
+val source_lines : string -> string array
+
+(** Parse Python source into a module.
+    Callers running several extractors over one source parse it once and
+    use the [*_from_module] variants. Error carries the parser message. *)
+val parse_module : string -> (PyreAst.Concrete.Module.t, string) result
+
 (** Parse Python source and extract all import statements.
     Returns empty list on parse error (non-fatal). *)
 val extract_imports : string -> import_stmt list
@@ -68,6 +77,16 @@ type logger_binding = {
     that uses the logger variable. *)
 val extract_logger_bindings : string -> logger_binding list
 
+(** Extract constants and logger bindings together, classifying each
+    module-level statement once.
+    Returns [(extract_constants source, extract_logger_bindings source)]. *)
+val extract_bindings : string -> module_constant list * logger_binding list
+
+(** [extract_bindings_from_module lines module_] is [extract_bindings] on an
+    already parsed module; [lines] is [source_lines] of its source. *)
+val extract_bindings_from_module :
+  string array -> PyreAst.Concrete.Module.t -> module_constant list * logger_binding list
+
 (** A top-level definition extracted from source *)
 type extracted_definition = {
   name : string;
@@ -83,3 +102,6 @@ type extracted_definition = {
     Only top-level definitions (column 0) are included.
     Decorated definitions include the decorator range. *)
 val extract_definitions : string -> extracted_definition list
+
+(** [extract_definitions] on an already parsed module *)
+val extract_definitions_from_module : PyreAst.Concrete.Module.t -> extracted_definition list
@@ -19,25 +19,21 @@ let kind_to_string = function
 
 let plan_text plan =
   let buf = Buffer.create 256 in
-  Buffer.add_string buf
-    (Printf.sprintf "Found %d definitions in %s:\n"
-      (List.length plan.definitions) plan.source_name);
+  Printf.bprintf buf "Found %d definitions in %s:\n"
+    (List.length plan.definitions) plan.source_name;
 
   List.iter (fun defn ->
-    Buffer.add_string buf
-      (Printf.sprintf "  %-15s %-40s lines %d-%d\n"
-        (kind_to_string defn.kind)
-        defn.name
-        defn.start_line
-        defn.end_line)
+    Printf.bprintf buf "  %-15s %-40s lines %d-%d\n"
+      (kind_to_string defn.kind)
+      defn.name
+      defn.start_line
+      defn.end_line
   ) plan.definitions;
 
-  Buffer.add_string buf
-    (Printf.sprintf "\nWill create %d files:\n" (List.length plan.output_files));
+  Printf.bprintf buf "\nWill create %d files:\n" (List.length plan.output_files);
 
   List.iter (fun f ->
-    Buffer.add_string buf
-      (Printf.sprintf "  %s (%d lines)\n" f.relative_path (line_count f.content))
+    Printf.bprintf buf "  %s (%d lines)\n" f.relative_path (line_count f.content)
   ) plan.output_files;
 
   (* Remove trailing newline to match Python *)
@@ -76,9 +72,8 @@ let extraction_text result ~name ~dry_run =
   let buf = Buffer.create 256 in
 
   if dry_run then begin
-    Buffer.add_string buf
-      (Printf.sprintf "[DRY RUN] Would extract '%s' to %s\n\n"
-        name result.extracted.relative_path);
+    Printf.bprintf buf "[DRY RUN] Would extract '%s' to %s\n\n"
+      name result.extracted.relative_path;
     Buffer.add_string buf "--- Extracted content ---\n";
     Buffer.add_string buf (String.trim result.extracted.content);
     Buffer.add_string buf "\n\n";
@@ -93,11 +88,9 @@ let extraction_text result ~name ~dry_run =
 
     let total_lines = List.length remainder_lines in
     if total_lines > 20 then
-      Buffer.add_string buf
-        (Printf.sprintf "... (%d more lines)" (total_lines - 20))
+      Printf.bprintf buf "... (%d more lines)" (total_lines - 20)
   end else begin
-    Buffer.add_string buf
-      (Printf.sprintf "Extracted '%s' to %s" name result.extracted.relative_path)
+    Printf.bprintf buf "Extracted '%s' to %s" name result.extracted.relative_path
   end;
 
   Buffer.contents buf
@@ -126,7 +119,7 @@ let format_lines start_line end_line =
 (** Render definition list in file order *)
 let list_text definitions ~source_name ~organized =
   let buf = Buffer.create 256 in
-  Buffer.add_string buf (Printf.sprintf "Definitions in %s:\n\n" source_name);
+  Printf.bprintf buf "Definitions in %s:\n\n" source_name;
 
   if organized then begin
     (* Group by kind *)
@@ -140,10 +133,9 @@ let list_text definitions ~source_name ~organized =
     ] in
     List.iter (fun (label, defs) ->
       if defs <> [] then begin
-        Buffer.add_string buf (Printf.sprintf "%s:\n" label);
+        Printf.bprintf buf "%s:\n" label;
         List.iter (fun d ->
-          Buffer.add_string buf
-            (Printf.sprintf "  %-20s %s\n" d.name (format_lines d.start_line d.end_line))
+          Printf.bprintf buf "  %-20s %s\n" d.name (format_lines d.start_line d.end_line)
         ) defs;
         Buffer.add_string buf "\n"
       end
@@ -151,17 +143,15 @@ let list_text definitions ~source_name ~organized =
   end else begin
     (* File order *)
     List.iter (fun d ->
-      Buffer.add_string buf
-        (Printf.sprintf "  %-20s %-15s %s\n"
-          d.name
-          (kind_to_string d.kind)
-          (format_lines d.start_line d.end_line))
+      Printf.bprintf buf "  %-20s %-15s %s\n"
+        d.name
+        (kind_to_string d.kind)
+        (format_lines d.start_line d.end_line)
     ) definitions;
     Buffer.add_string buf "\n"
   end;
 
-  Buffer.add_string buf
-    (Printf.sprintf "%d definitions found" (List.length definitions));
+  Printf.bprintf buf "%d definitions found" (List.length definitions);
   Buffer.contents buf
 
 (** Render definition list as JSON *)
@@ -195,15 +185,15 @@ let current_date () =
 let manifest_yaml ~source_name ~prefix_kind ~definitions =
   let buf = Buffer.create 512 in
   Buffer.add_string buf "# Auto-generated by atomyst\n";
-  Buffer.add_string buf (Printf.sprintf "source: %s\n" source_name);
-  Buffer.add_string buf (Printf.sprintf "extracted: %s\n\n" (current_date ()));
+  Printf.bprintf buf "source: %s\n" source_name;
+  Printf.bprintf buf "extracted: %s\n\n" (current_date ());
   Buffer.add_string buf "definitions:\n";
   List.iter (fun (d : definition) ->
     let filename = Prefix.generate_filename ~prefix_kind d in
-    Buffer.add_string buf (Printf.sprintf "  - file: %s\n" filename);
-    Buffer.add_string buf (Printf.sprintf "    name: %s\n" d.name);
-    Buffer.add_string buf (Printf.sprintf "    kind: %s\n" (kind_to_string d.kind));
-    Buffer.add_string buf (Printf.sprintf "    lines: %d-%d\n" d.start_line d.end_line);
+    Printf.bprintf buf "  - file: %s\n" filename;
+    Printf.bprintf buf "    name: %s\n" d.name;
+    Printf.bprintf buf "    kind: %s\n" (kind_to_string d.kind);
+    Printf.bprintf buf "    lines: %d-%d\n" d.start_line d.end_line;
     Buffer.add_string buf "\n"
   ) definitions;
   Buffer.contents buf
@@ -233,16 +223,15 @@ let manifest_json ~source_name ~prefix_kind ~definitions =
 let manifest_md ~source_name ~prefix_kind ~definitions =
   let buf = Buffer.create 512 in
   Buffer.add_string buf "# Atomyst Manifest\n\n";
-  Buffer.add_string buf (Printf.sprintf "**Source:** `%s`\n\n" source_name);
-  Buffer.add_string buf (Printf.sprintf "**Extracted:** %s\n\n" (current_date ()));
+  Printf.bprintf buf "**Source:** `%s`\n\n" source_name;
+  Printf.bprintf buf "**Extracted:** %s\n\n" (current_date ());
   Buffer.add_string buf "## Definitions\n\n";
   Buffer.add_string buf "| File | Name | Kind | Lines |\n";
   Buffer.add_string buf "|------|------|------|-------|\n";
   List.iter (fun (d : definition) ->
     let filename = Prefix.generate_filename ~prefix_kind d in
-    Buffer.add_string buf
-      (Printf.sprintf "| `%s` | %s | %s | %d-%d |\n"
-        filename d.name (kind_to_string d.kind) d.start_line d.end_line)
+    Printf.bprintf buf "| `%s` | %s | %s | %d-%d |\n"
+      filename d.name (kind_to_string d.kind) d.start_line d.end_line
   ) definitions;
   Buffer.contents buf
 
@@ -53,9 +53,7 @@ type fix_result =
   | Error of string
 
 (** Helper: check if string starts with prefix *)
-let starts_with s prefix =
-  String.length s >= String.length prefix &&
-  String.sub s 0 (String.length prefix) = prefix
+let starts_with s prefix = String.starts_with ~prefix s
 
 (** Find the git repository root containing a path *)
 let find_git_root path =
@@ -162,11 +160,7 @@ let module_basename module_path =
   | [] -> module_path
 
 (** Check if a string ends with a suffix *)
-let ends_with s suffix =
-  let s_len = String.length s in
-  let suffix_len = String.length suffix in
-  s_len >= suffix_len &&
-  String.sub s (s_len - suffix_len) suffix_len = suffix
+let ends_with s suffix = String.ends_with ~suffix s
 
 (** Convert Python_parser.import_stmt to consumer_import.
     Only handles ImportFrom since we're looking for "from X import Y" *)
@@ -213,6 +207,13 @@ let find_imports_from_module ~consumer_source ~target_module =
     ends_with imp.target_module ("." ^ module_name)
   ) imports
 
+(** Pre-filter for consumer sources, compiled once per target module.
+    Every import find_imports_from_module keeps spells out the module's
+    last component, so a source that never mentions it needs no parse. *)
+let mentions_module ~target_module =
+  let pattern = Re.compile (Re.str (module_basename target_module)) in
+  fun source -> Re.execp pattern source
+
 (** Get directory parts for a file (excludes the filename itself) *)
 let dir_parts file =
   let dir = Filename.dirname file in
@@ -419,6 +420,7 @@ let fix_consumer_imports ~atomized_file ~defined_names ~reexports =
       else atomized_file
     in
 
+    let may_import = mentions_module ~target_module:atomized_module in
     let all_rewrites = ref [] in
     let all_details = ref [] in
     let files_changed = ref 0 in
@@ -439,81 +441,84 @@ let fix_consumer_imports ~atomized_file ~defined_names ~reexports =
           let source = really_input_string ic (in_channel_length ic) in
           close_in ic;
 
-          let imports = find_imports_from_module ~consumer_source:source ~target_module:atomized_module in
-
-          (* Check for star imports first *)
-          match List.find_opt (fun imp -> imp.has_star) imports with
-          | Some star_import ->
-            StarImportError { file = file_path; line = star_import.start_row + 1 }
-          | None ->
-            (* Track names moved for this file *)
-            let file_names_moved = ref [] in
-
-            (* Generate rewrites for each import *)
-            let file_rewrites = List.filter_map (fun import ->
-              let classifications = List.map (fun n ->
-                (n.name, classify_import_name ~name:n.name ~defined_names ~reexports)
-              ) import.names in
-
-              (* Skip if all names are definitions (no change needed) *)
-              let needs_rewrite = List.exists (fun (_, c) ->
-                match c with Definition -> false | _ -> true
-              ) classifications in
-
-              if not needs_rewrite then None
-              else begin
-                (* Track which names moved where - use adjusted import for reporting *)
-                List.iter (fun (name, classification) ->
-                  match classification with
-                  | Reexport { original_module } ->
-                    let adjusted = adjust_import_for_consumer
-                      ~source_file:source_file_relative ~consumer_file:file ~original_import:original_module in
-                    file_names_moved := (name, import.target_module, adjusted) :: !file_names_moved
-                  | _ -> ()
-                ) classifications;
-
-                let new_text = generate_replacement_imports ~import ~classifications
-                  ~source_file:source_file_relative ~consumer_file:file in
-                (* Get old text from source *)
-                let lines = Array.of_list (String.split_on_char '\n' source) in
-                let old_text =
-                  if import.start_row = import.end_row then
-                    let line = lines.(import.start_row) in
-                    String.sub line import.start_col (import.end_col - import.start_col)
-                  else
-                    (* Multi-line *)
-                    let buf = Buffer.create 128 in
-                    for i = import.start_row to import.end_row do
-                      if i = import.start_row then
-                        Buffer.add_string buf (String.sub lines.(i) import.start_col
-                          (String.length lines.(i) - import.start_col))
-                      else if i = import.end_row then
-                        Buffer.add_string buf ("\n" ^ String.sub lines.(i) 0 import.end_col)
-                      else
-                        Buffer.add_string buf ("\n" ^ lines.(i))
-                    done;
-                    Buffer.contents buf
-                in
-                Some {
-                  file_path;
-                  start_row = import.start_row;
-                  start_col = import.start_col;
-                  end_row = import.end_row;
-                  end_col = import.end_col;
-                  old_text;
-                  new_text;
-                }
-              end
-            ) imports in
-
-            if file_rewrites <> [] then begin
-              all_rewrites := file_rewrites @ !all_rewrites;
-              all_details := { file_path; names_moved = List.rev !file_names_moved } :: !all_details;
-              incr files_changed;
-              (* Apply rewrites to file *)
-              apply_rewrites ~file_path ~rewrites:file_rewrites
-            end;
-            process_files rest
+          if not (may_import source) then process_files rest
+          else begin
+            let imports = find_imports_from_module ~consumer_source:source ~target_module:atomized_module in
+
+            (* Check for star imports first *)
+            match List.find_opt (fun imp -> imp.has_star) imports with
+            | Some star_import ->
+              StarImportError { file = file_path; line = star_import.start_row + 1 }
+            | None ->
+              (* Track names moved for this file *)
+              let file_names_moved = ref [] in
+
+              (* Generate rewrites for each import *)
+              let file_rewrites = List.filter_map (fun import ->
+                let classifications = List.map (fun n ->
+                  (n.name, classify_import_name ~name:n.name ~defined_names ~reexports)
+                ) import.names in
+
+                (* Skip if all names are definitions (no change needed) *)
+                let needs_rewrite = List.exists (fun (_, c) ->
+                  match c with Definition -> false | _ -> true
+                ) classifications in
+
+                if not needs_rewrite then None
+                else begin
+                  (* Track which names moved where - use adjusted import for reporting *)
+                  List.iter (fun (name, classification) ->
+                    match classification with
+                    | Reexport { original_module } ->
+                      let adjusted = adjust_import_for_consumer
+                        ~source_file:source_file_relative ~consumer_file:file ~original_import:original_module in
+                      file_names_moved := (name, import.target_module, adjusted) :: !file_names_moved
+                    | _ -> ()
+                  ) classifications;
+
+                  let new_text = generate_replacement_imports ~import ~classifications
+                    ~source_file:source_file_relative ~consumer_file:file in
+                  (* Get old text from source *)
+                  let lines = Array.of_list (String.split_on_char '\n' source) in
+                  let old_text =
+                    if import.start_row = import.end_row then
+                      let line = lines.(import.start_row) in
+                      String.sub line import.start_col (import.end_col - import.start_col)
+                    else
+                      (* Multi-line *)
+                      let buf = Buffer.create 128 in
+                      for i = import.start_row to import.end_row do
+                        if i = import.start_row then
+                          Buffer.add_string buf (String.sub lines.(i) import.start_col
+                            (String.length lines.(i) - import.start_col))
+                        else if i = import.end_row then
+                          Buffer.add_string buf ("\n" ^ String.sub lines.(i) 0 import.end_col)
+                        else
+                          Buffer.add_string buf ("\n" ^ lines.(i))
+                      done;
+                      Buffer.contents buf
+                  in
+                  Some {
+                    file_path;
+                    start_row = import.start_row;
+                    start_col = import.start_col;
+                    end_row = import.end_row;
+                    end_col = import.end_col;
+                    old_text;
+                    new_text;
+                  }
+                end
+              ) imports in
+
+              if file_rewrites <> [] then begin
+                all_rewrites := file_rewrites @ !all_rewrites;
+                all_details := { file_path; names_moved = List.rev !file_names_moved } :: !all_details;
+                incr files_changed;
+                (* Apply rewrites to file *)
+                apply_rewrites ~file_path ~rewrites:file_rewrites
+              end;
+              process_files rest
+          end
         end
     in
     process_files python_files
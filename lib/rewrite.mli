@@ -82,6 +82,11 @@ val find_imports_from_module :
 (** [find_imports_from_module ~consumer_source ~target_module] finds all imports
     in [consumer_source] that import from [target_module]. *)
 
+val mentions_module : target_module:string -> string -> bool
+(** [mentions_module ~target_module] compiles a cheap pre-filter: the
+    returned predicate is false for sources that cannot contain an import
+    of [target_module], so they can skip [find_imports_from_module]. *)
+
 val classify_import_name :
   name:string ->
   defined_names:string list ->
@@ -1,17 +1,43 @@
 (** Convert PascalCase/camelCase identifiers to snake_case. *)
 
-(** Regex: any char followed by uppercase then lowercase(s)
-    Example: "HTTPServer" matches ("P", "Se") -> "HTTP_Server" *)
-let re_upper_lower = Re.Pcre.regexp {|(.)([A-Z][a-z]+)|}
+(** Character class bits, looked up from a 256-entry table so each byte is
+    classified with one load instead of a chain of range comparisons.
+    Bytes outside ASCII letters and digits have no class. *)
+let upper = 1
+let lower = 2
+let digit = 4
 
-(** Regex: lowercase or digit followed by uppercase
-    Example: "getID" matches ("t", "I") and ("I", "D") -> "get_ID" *)
-let re_lower_upper = Re.Pcre.regexp {|([a-z0-9])([A-Z])|}
+let char_class =
+  Array.init 256 (fun code ->
+    let c = Char.chr code in
+    if c >= 'A' && c <= 'Z' then upper
+    else if c >= 'a' && c <= 'z' then lower
+    else if c >= '0' && c <= '9' then digit
+    else 0)
 
+let class_of c = char_class.(Char.code c)
+
+(** Single pass: an underscore goes before an uppercase letter (never the
+    first char) when the previous char is lowercase or a digit
+    ("getID" -> "get_ID"), or when the next char is lowercase, which ends
+    an acronym ("HTTPServer" -> "HTTP_Server").
+    Same output as the regex passes (.)([A-Z][a-z]+) then
+    ([a-z0-9])([A-Z]) followed by lowercasing, for any identifier.
+    Names with no uppercase letter are already in their final form. *)
 let to_snake_case name =
-  name
-  |> Re.replace re_upper_lower ~f:(fun g ->
-       Re.Group.get g 1 ^ "_" ^ Re.Group.get g 2)
-  |> Re.replace re_lower_upper ~f:(fun g ->
-       Re.Group.get g 1 ^ "_" ^ Re.Group.get g 2)
-  |> String.lowercase_ascii
+  if not (String.exists (fun c -> class_of c = upper) name) then name
+  else begin
+    let n = String.length name in
+    let buf = Buffer.create (n + n / 2) in
+    let prev = ref 0 in
+    String.iteri (fun i c ->
+      let cls = class_of c in
+      if cls = upper && i > 0
+         && (!prev land (lower lor digit) <> 0
+             || (i + 1 < n && class_of name.[i + 1] = lower))
+      then Buffer.add_char buf '_';
+      Buffer.add_char buf (Char.lowercase_ascii c);
+      prev := cls
+    ) name;
+    Buffer.contents buf
+  end
@@ -3,12 +3,12 @@
     This module provides name conversion following Python naming conventions.
     Used to convert class names (PascalCase) to file names (snake_case).
 
-    Algorithm (two-pass regex):
-    1. Insert underscore before uppercase letters that start a lowercase sequence
-       "HTTPServer" -> "HTTP_Server"
-    2. Insert underscore between lowercase/digit followed by uppercase
-       "HTTP_Server" -> "HTTP_Server" (no change), "getID" -> "get_ID"
-    3. Lowercase the result
+    Algorithm (single pass over the characters):
+    1. Insert underscore before an uppercase letter that starts a lowercase
+       sequence: "HTTPServer" -> "HTTP_Server"
+    2. Insert underscore before an uppercase letter that follows a
+       lowercase letter or digit: "getID" -> "get_ID"
+    3. Lowercase as we go
 
     Examples:
     - "SimpleClass" -> "simple_class"
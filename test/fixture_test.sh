@@ -4,6 +4,16 @@ set -euo pipefail
 
 cd "$(dirname "$0")/.."
 
+# Build once up front; each fixture then runs the built binary directly
+# instead of paying for opam env and a dune exec rebuild check per fixture
+eval $(opam env) && dune build ./bin/main.exe
+BUILD_DIR="${DUNE_BUILD_DIR:-_build}"
+case "$BUILD_DIR" in
+    /*) ;;
+    *) BUILD_DIR="$PWD/$BUILD_DIR" ;;
+esac
+ATOMYST="$BUILD_DIR/default/bin/main.exe"
+
 PASS=0
 FAIL=0
 TMPDIR=$(mktemp -d)
@@ -28,7 +38,7 @@ test_fixture() {
     fi
 
     # Run atomyst (always keep original for tests)
-    eval $(opam env) && dune exec atomyst -- atomize "$fixture/input.py" -o "$output_dir" --keep-original $extra_opts 2>/dev/null
+    "$ATOMYST" atomize "$fixture/input.py" -o "$output_dir" --keep-original $extra_opts 2>/dev/null
 
     # Compare output to expected (ignoring timestamps)
     # Use diff with -I to ignore timestamp lines in __init__.py
@@ -28,54 +28,60 @@ let definitions_testable =
   Alcotest.(list definition_testable)
 
 (* ============================================================
-   Test: 01_simple_class
-   Expected: Person lines 6-14 (with @dataclass decorator on line 6)
+   Test: extract_definitions on fixtures
+   One row per fixture: (fixture, description, expected definitions).
+   Expected ranges come from the Python implementation on the same input.
    ============================================================ *)
-let test_01_simple_class () =
-  let source = read_fixture "test/fixtures/01_simple_class/input.py" in
-  let defs = Extract.extract_definitions source in
-  Alcotest.(check definitions_testable) "single class"
-    [ def "Person" Class 6 14 ]
-    defs
+let definition_cases =
+  [ (* Person includes its @dataclass decorator on line 6 *)
+    ("01_simple_class", "single class",
+     [ def "Person" Class 6 14 ]);
+    ("02_multiple_classes", "multiple classes",
+     [ def "Point" Class 7 12;
+       def "Rectangle" Class 15 28;
+       def "Circle" Class 31 37 ]);
+    ("03_decorators", "decorated definitions",
+     [ def "log_calls" Function 10 18;
+       def "Priority" Class 21 30;
+       def "expensive_computation" Function 33 37 ]);
+    ("06_async_functions", "async functions",
+     [ def "fetch_data" AsyncFunction 7 10;
+       def "process_items" AsyncFunction 13 15;
+       def "AsyncClient" Class 18 27 ]);
+  ]
 
-(* ============================================================
-   Test: 02_multiple_classes
-   Expected from Python: Point 7-12, Rectangle 15-28, Circle 31-37
-   ============================================================ *)
-let test_02_multiple_classes () =
-  let source = read_fixture "test/fixtures/02_multiple_classes/input.py" in
+let test_definitions fixture description expected () =
+  let source = read_fixture (Printf.sprintf "test/fixtures/%s/input.py" fixture) in
   let defs = Extract.extract_definitions source in
-  Alcotest.(check definitions_testable) "multiple classes"
-    [ def "Point" Class 7 12;
-      def "Rectangle" Class 15 28;
-      def "Circle" Class 31 37 ]
-    defs
+  Alcotest.(check definitions_testable) description expected defs
 
 (* ============================================================
-   Test: 03_decorators
-   Expected from Python: log_calls 10-18, Priority 21-30, expensive_computation 33-37
+   Test: comment_start_table
+   Each entry is where the comment block above that line starts
    ============================================================ *)
-let test_03_decorators () =
-  let source = read_fixture "test/fixtures/03_decorators/input.py" in
-  let defs = Extract.extract_definitions source in
-  Alcotest.(check definitions_testable) "decorated definitions"
-    [ def "log_calls" Function 10 18;
-      def "Priority" Class 21 30;
-      def "expensive_computation" Function 33 37 ]
-    defs
+let test_comment_start_table () =
+  let lines = [|
+    "import os\n";
+    "\n";
+    "# first\n";
+    "  # second\n";
+    "class Foo:\n";
+    "    pass\n";
+    "def bar():\n";
+  |] in
+  Alcotest.(check (array int)) "block starts"
+    [| 1; 2; 3; 3; 3; 6; 7 |]
+    (Extract.comment_start_table lines)
 
 (* ============================================================
-   Test: 06_async_functions
-   Expected from Python: fetch_data 7-10, process_items 13-15, AsyncClient 18-27
+   Test: concat_lines
+   Joins a range of lines; empty ranges give ""
    ============================================================ *)
-let test_06_async_functions () =
-  let source = read_fixture "test/fixtures/06_async_functions/input.py" in
-  let defs = Extract.extract_definitions source in
-  Alcotest.(check definitions_testable) "async functions"
-    [ def "fetch_data" AsyncFunction 7 10;
-      def "process_items" AsyncFunction 13 15;
-      def "AsyncClient" Class 18 27 ]
-    defs
+let test_concat_lines () =
+  let lines = [| "a\n"; "bc\n"; "\n"; "d\n" |] in
+  Alcotest.(check string) "middle range" "bc\n\n" (Extract.concat_lines lines 1 2);
+  Alcotest.(check string) "whole array" "a\nbc\n\nd\n" (Extract.concat_lines lines 0 4);
+  Alcotest.(check string) "empty range" "" (Extract.concat_lines lines 4 0)
 
 (* ============================================================
    Test suite
@@ -83,9 +89,13 @@ let test_06_async_functions () =
 let () =
   Alcotest.run "extract"
     [ ( "extract_definitions",
-        [ Alcotest.test_case "01_simple_class" `Quick test_01_simple_class;
-          Alcotest.test_case "02_multiple_classes" `Quick test_02_multiple_classes;
-          Alcotest.test_case "03_decorators" `Quick test_03_decorators;
-          Alcotest.test_case "06_async_functions" `Quick test_06_async_functions
+        List.map (fun (fixture, description, expected) ->
+          Alcotest.test_case fixture `Quick (test_definitions fixture description expected)
+        ) definition_cases );
+      ( "comment_start_table",
+        [ Alcotest.test_case "block starts" `Quick test_comment_start_table
+        ] );
+      ( "concat_lines",
+        [ Alcotest.test_case "ranges" `Quick test_concat_lines
         ] )
     ]
@@ -112,6 +112,34 @@ let test_multiline_docstring () =
   Alcotest.(check bool) "from typing in imports"
     true (List.mem "from typing import List\n" imports)
 
+(** Test which leading comments count as pragmas: every directive with and
+    without a space after '#', and near misses that must stay plain comments *)
+let test_pragma_forms () =
+  let is_pragma comment =
+    let lines = [comment ^ "\n"; "import os\n"] in
+    (Extract.extract_imports_full lines).skipped_pragmas
+  in
+  let pragmas = [
+    "# mypy: strict"; "#mypy: strict";
+    "# type: ignore"; "#type: ignore";
+    "# noqa"; "#noqa";
+    "# pylint: disable=all"; "#pylint: disable=all";
+    "# ruff: noqa"; "#ruff: noqa";
+  ] in
+  List.iter (fun comment ->
+    Alcotest.(check bool) comment true (is_pragma comment)
+  ) pragmas;
+  let not_pragmas = [
+    "# mypy"; "#  noqa"; "#  mypy: strict"; "# pylint"; "# ruff";
+    "## noqa"; "# TODO: noqa"; "# some comment";
+  ] in
+  List.iter (fun comment ->
+    Alcotest.(check bool) comment false (is_pragma comment)
+  ) not_pragmas;
+  (* Kept pragmas come through verbatim *)
+  let kept = Extract.extract_imports_full ~keep_pragmas:true ["#noqa\n"; "import os\n"] in
+  Alcotest.(check (list string)) "kept pragma" ["#noqa\n"; "import os\n"] kept.lines
+
 (** Test relative import depth adjustment - single dot becomes double dot *)
 let test_adjust_relative_single_dot () =
   let lines = [
@@ -300,6 +328,13 @@ let test_find_constant_refs_type_annotation () =
   let refs = Extract.find_constant_references ~constant_names ~defn_content:content in
   Alcotest.(check int) "found both" 2 (List.length refs)
 
+(** Names sharing a prefix are told apart *)
+let test_find_constant_refs_shared_prefix () =
+  let constant_names = ["FOO"; "FOO_BAR"; "BAR"] in
+  let content = "x = FOO_BAR\n" in
+  let refs = Extract.find_constant_references ~constant_names ~defn_content:content in
+  Alcotest.(check (list string)) "only FOO_BAR" ["FOO_BAR"] refs
+
 (** ===== Docstring extraction tests ===== *)
 
 (** Single-line docstring is captured *)
@@ -370,6 +405,7 @@ let () =
           Alcotest.test_case "shebang" `Quick test_shebang;
           Alcotest.test_case "type_checking" `Quick test_type_checking;
           Alcotest.test_case "multiline_docstring" `Quick test_multiline_docstring;
+          Alcotest.test_case "pragma_forms" `Quick test_pragma_forms;
         ] );
       ( "adjust_relative_imports",
         [ Alcotest.test_case "single_dot" `Quick test_adjust_relative_single_dot;
@@ -395,6 +431,7 @@ let () =
           Alcotest.test_case "no_substring" `Quick test_find_constant_refs_no_substring;
           Alcotest.test_case "empty" `Quick test_find_constant_refs_empty;
           Alcotest.test_case "type_annotation" `Quick test_find_constant_refs_type_annotation;
+          Alcotest.test_case "shared_prefix" `Quick test_find_constant_refs_shared_prefix;
         ] );
       ( "docstring_extraction",
         [ Alcotest.test_case "single_line" `Quick test_docstring_single_line;
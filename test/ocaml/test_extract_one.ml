@@ -13,9 +13,12 @@ let read_fixture path =
   close_in ic;
   s
 
+(** Fixture input, read once and shared by every test *)
+let input_source = lazy (read_fixture "test/fixtures/10_incremental/input.py")
+
 (** Test extracting Foo from input *)
 let test_extract_foo () =
-  let source = read_fixture "test/fixtures/10_incremental/input.py" in
+  let source = Lazy.force input_source in
   let expected_content = read_fixture "test/fixtures/10_incremental/extract_foo/expected_foo.py" in
   let expected_remainder = read_fixture "test/fixtures/10_incremental/extract_foo/expected_remainder.py" in
 
@@ -31,7 +34,7 @@ let test_extract_foo () =
 
 (** Test extracting Bar from input *)
 let test_extract_bar () =
-  let source = read_fixture "test/fixtures/10_incremental/input.py" in
+  let source = Lazy.force input_source in
   let expected_content = read_fixture "test/fixtures/10_incremental/extract_bar/expected_bar.py" in
   let expected_remainder = read_fixture "test/fixtures/10_incremental/extract_bar/expected_remainder.py" in
 
@@ -47,7 +50,7 @@ let test_extract_bar () =
 
 (** Test extracting non-existent definition *)
 let test_extract_not_found () =
-  let source = read_fixture "test/fixtures/10_incremental/input.py" in
+  let source = Lazy.force input_source in
   match Extract.extract_one source "NonExistent" with
   | None -> ()
   | Some _ -> Alcotest.fail "Expected None, got Some"
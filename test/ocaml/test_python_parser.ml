@@ -304,10 +304,9 @@ let test_logger_binding_no_match () =
   let source = {|import logging
 logger = logging.getLogger("explicit_name")
 CONST = 42|} in
-  let bindings = Python_parser.extract_logger_bindings source in
+  let constants, bindings = Python_parser.extract_bindings source in
   Alcotest.(check int) "no bindings" 0 (List.length bindings);
   (* But it should still be a constant since it doesn't use __name__ *)
-  let constants = Python_parser.extract_constants source in
   let names = List.map (fun (c : Python_parser.module_constant) -> c.name) constants in
   Alcotest.(check bool) "logger is constant" true (List.mem "logger" names)
 
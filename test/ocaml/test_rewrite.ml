@@ -249,6 +249,47 @@ def process(q: Query) -> Response:
     Alcotest.(check bool) "Query found" true (List.mem "Query" names)
   end
 
+(** Test that consumers never mentioning the module yield no imports *)
+let test_find_consumer_imports_unrelated () =
+  let consumer_source = {|"""Unrelated consumer."""
+
+from ..pkg.views import render
+|} in
+  let target_module = "test.fixtures.13_consumer_rewrite.pkg.models" in
+  let imports = Rewrite.find_imports_from_module ~consumer_source ~target_module in
+  Alcotest.(check int) "no imports" 0 (List.length imports);
+  Alcotest.(check bool) "pre-filter rejects" false
+    (Rewrite.mentions_module ~target_module consumer_source)
+
+let test_mentions_module_parent_import () =
+  (* The module is only named as an imported symbol of its parent package:
+     the pre-filter must let it through and leave the decision to the parser *)
+  let consumer_source = {|"""Imports the module object itself."""
+
+from ..pkg import models
+
+q = models.Query()
+|} in
+  let target_module = "test.fixtures.13_consumer_rewrite.pkg.models" in
+  Alcotest.(check bool) "pre-filter accepts" true
+    (Rewrite.mentions_module ~target_module consumer_source);
+  let imports = Rewrite.find_imports_from_module ~consumer_source ~target_module in
+  Alcotest.(check int) "no import from the module" 0 (List.length imports)
+
+let test_mentions_module_submodule_import () =
+  let consumer_source = {|from ..pkg import views
+from ..pkg.models import Query
+|} in
+  let target_module = "test.fixtures.13_consumer_rewrite.pkg.models" in
+  Alcotest.(check bool) "pre-filter accepts" true
+    (Rewrite.mentions_module ~target_module consumer_source);
+  let imports = Rewrite.find_imports_from_module ~consumer_source ~target_module in
+  Alcotest.(check int) "one import" 1 (List.length imports);
+  let imp = List.hd imports in
+  Alcotest.(check string) "target module" "..pkg.models" imp.target_module;
+  Alcotest.(check (list string)) "names" ["Query"]
+    (List.map (fun n -> n.Rewrite.name) imp.names)
+
 (** Test adjust_import_for_consumer - GitHub #14 bug fix *)
 let test_adjust_import_same_level () =
   (* Source: pkg/models.py has "from .common import X"
@@ -366,5 +407,8 @@ let () =
           Alcotest.test_case "find_imports_suffix" `Quick test_find_consumer_imports_suffix;
           Alcotest.test_case "find_imports_absolute" `Quick test_find_consumer_imports_absolute;
           Alcotest.test_case "find_imports_multiline" `Quick test_find_consumer_imports_multiline;
+          Alcotest.test_case "find_imports_unrelated" `Quick test_find_consumer_imports_unrelated;
+          Alcotest.test_case "mentions_module_parent_import" `Quick test_mentions_module_parent_import;
+          Alcotest.test_case "mentions_module_submodule_import" `Quick test_mentions_module_submodule_import;
         ] )
     ]